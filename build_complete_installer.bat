@@ -7,6 +7,9 @@ echo.
 REM Set error handling
 setlocal enabledelayedexpansion
 
+REM Release builds are UPX compressed (set BUILD_UPX=0 to skip)
+if not defined BUILD_UPX set "BUILD_UPX=1"
+
 REM Step 1: Build standalone executables
 echo [1/3] Building standalone executables with PyInstaller...
 echo.
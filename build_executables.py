@@ -5,349 +5,459 @@ This script uses PyInstaller to create .exe files that don't require Python inst
 
 import os
 import sys
+import json
+import hashlib
+import shlex
 import subprocess
 import shutil
+import textwrap
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from importlib.metadata import PackageNotFoundError, distributions, version
 from pathlib import Path
 
-def run_command(cmd, description):
-    """Run a command and handle errors"""
+BUILD_CACHE_FILE = '.build_cache.json'
+
+# One entry per executable; the spec options are rendered into <spec> and
+# the same files are fingerprinted for the build cache
+BUILD_TARGETS = [
+    {
+        'spec': 'service.spec',
+        'entry': 'hardware_monitor_service.py',
+        'name': 'TrayHardwareMonitorService',
+        'description': 'Building Windows Service executable',
+        'console': True,
+        # win32serviceutil loads win32timezone lazily
+        'hidden': ('win32timezone',),
+        'binaries': (
+            ('LibreHardwareMonitorLib.dll', '.'),
+            ('LibreHardwareMonitorLib.sys', '.'),
+        ),
+        'datas': (('icon.ico', '.'),),
+    },
+    {
+        'spec': 'client.spec',
+        'entry': 'tray_serial_monitor_client.py',
+        'name': 'TraySerialMonitorClient',
+        'description': 'Building Client GUI executable',
+        'console': False,
+        # pystray selects its backend at runtime
+        'hidden': ('pystray._win32',),
+        'binaries': (),
+        'datas': (('icon.ico', '.'),),
+    },
+    {
+        'spec': 'installer.spec',
+        'entry': 'install_service.py',
+        'name': 'InstallService',
+        'description': 'Building Service Installer executable',
+        'console': True,
+        'hidden': (),
+        'binaries': (),
+        'datas': (('icon.ico', '.'),),
+    },
+    {
+        'spec': 'uninstaller.spec',
+        'entry': 'uninstall_service.py',
+        'name': 'UninstallService',
+        'description': 'Building Service Uninstaller executable',
+        'console': True,
+        'hidden': (),
+        'binaries': (),
+        'datas': (),
+    },
+]
+
+# Native/signed DLLs that UPX corrupts or cannot shrink
+UPX_EXCLUDE = [
+    'vcruntime140.dll',
+    'vcruntime140_1.dll',
+    'python3.dll',
+    f'python{sys.version_info.major}{sys.version_info.minor}.dll',
+    'LibreHardwareMonitorLib.dll',
+]
+
+MERGED_SPEC = 'build_all.spec'
+
+_SPEC_HEADER = textwrap.dedent('''\
+    # -*- mode: python ; coding: utf-8 -*-
+
+    import importlib.util
+
+
+    def installed(modules):
+        # Analysis follows every import in the script; only modules imported
+        # dynamically need listing here, and only if they are installed
+        return [m for m in modules if importlib.util.find_spec(m)]
+''')
+
+_ANALYSIS_TEMPLATE = textwrap.dedent('''
+    {var} = Analysis(
+        [{entry!r}],
+        pathex=[],
+        binaries={binaries!r},
+        datas={datas!r},
+        hiddenimports=installed({hidden!r}),
+        hookspath=[],
+        hooksconfig={{}},
+        runtime_hooks=[],
+        excludes=[],
+        noarchive=False,
+    )
+''')
+
+_EXE_TEMPLATE = textwrap.dedent('''
+    {var}_pyz = PYZ({var}.pure)
+
+    {var}_exe = EXE(
+        {var}_pyz,
+        {var}.scripts,
+        {var}.binaries,
+        {var}.datas,
+        {dependencies},
+        name={name!r},
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx={upx},
+        upx_exclude={upx_exclude!r},
+        runtime_tmpdir={runtime_tmpdir!r},
+        console={console},
+        disable_windowed_traceback=False,
+        argv_emulation=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+        icon={icon!r},
+    )
+''')
+
+def run_command(cmd, description, env=None, label=None):
+    """Run a command, streaming its output, and handle errors"""
+    if isinstance(cmd, str):
+        cmd = shlex.split(cmd)
+    # Prefix output lines so concurrent builds stay readable
+    prefix = f"[{label}] " if label else ""
+
     print(f"\n{description}...")
-    print(f"Running: {cmd}")
+    print(f"Running: {subprocess.list2cmdline(cmd)}")
+
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors='replace',
+            bufsize=1,
+            env=env,
+        )
+    except OSError as e:
+        print(f"{description} failed!")
+        print("Error:", e)
+        return False
 
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    with proc:
+        for line in proc.stdout:
+            sys.stdout.write(prefix + line)
 
-    if result.returncode == 0:
+    if proc.returncode == 0:
         print(f"{description} completed successfully")
-        if result.stdout:
-            print("Output:", result.stdout.strip())
     else:
-        print(f"{description} failed!")
-        print("Error:", result.stderr.strip())
+        print(f"{description} failed! (exit code {proc.returncode})")
         return False
 
     return True
 
 def check_pyinstaller():
     """Check if PyInstaller is installed"""
+    # Reading the package metadata avoids starting PyInstaller just for --version.
+    # The metadata is that of this interpreter, so pip and the builds run
+    # under sys.executable rather than whatever 'python' is on PATH
     try:
-        result = subprocess.run(['python', '-m', 'PyInstaller', '--version'], capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"PyInstaller found: {result.stdout.strip()}")
-            return True
-    except FileNotFoundError:
+        print(f"PyInstaller found: {version('pyinstaller')}")
+        return True
+    except PackageNotFoundError:
         pass
 
     print("PyInstaller not found. Installing...")
-    return run_command('python -m pip install pyinstaller', 'Installing PyInstaller')
-
-def create_service_spec():
-    """Create PyInstaller spec file for the service"""
-    spec_content = '''# -*- mode: python ; coding: utf-8 -*-
-
-a = Analysis(
-    ['hardware_monitor_service.py'],
-    pathex=[],
-    binaries=[
-        ('LibreHardwareMonitorLib.dll', '.'),
-        ('LibreHardwareMonitorLib.sys', '.'),
-    ],
-    datas=[
-        ('icon.ico', '.'),
-    ],
-    hiddenimports=[
-        'win32serviceutil',
-        'win32service',
-        'win32event',
-        'win32pipe',
-        'win32file',
-        'win32api',
-        'win32con',
-        'pywintypes',
-        'servicemanager',
-        'win32security',
-        'win32process',
-        'winerror',
-        'win32com',
-        'win32com.client',
-        'pythoncom',
-        'pywin32_system32',
-        'win32timezone',
-        'win32clipboard',
-        'win32gui',
-        'win32pdh',
-    ],
-    hookspath=[],
-    hooksconfig={},
-    runtime_hooks=[],
-    excludes=[],
-    noarchive=False,
-)
-
-pyz = PYZ(a.pure)
-
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.datas,
-    [],
-    name='TrayHardwareMonitorService',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir='C:\\TrayTemp',
-    console=True,
-    disable_windowed_traceback=False,
-    argv_emulation=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-    icon='icon.ico',
-)
-'''
-
-    with open('service.spec', 'w') as f:
-        f.write(spec_content)
-    print("Created service.spec")
-
-def create_client_spec():
-    """Create PyInstaller spec file for the client"""
-    spec_content = '''# -*- mode: python ; coding: utf-8 -*-
-
-a = Analysis(
-    ['tray_serial_monitor_client.py'],
-    pathex=[],
-    binaries=[],
-    datas=[
-        ('icon.ico', '.'),
-    ],
-    hiddenimports=[
-        'pystray',
-        'PIL',
-        'PIL.Image',
-        'serial',
-        'win32file',
-        'win32pipe',
-        'win32con',
-        'win32api',
-        'win32event',
-        'pywintypes',
-        'json',
-        'threading',
-        'time',
-        'tkinter',
-        'tkinter.messagebox',
-        'tkinter.simpledialog',
-        # Additional win32 modules for named pipe communication
-        'win32security',
-        'win32process',
-        'winerror',
-        'win32service',
-        'win32serviceutil',
-        'servicemanager',
-        'win32com',
-        'win32com.client',
-        'pythoncom',
-        'pywin32_system32',
-        # Additional modules that might be needed
-        'win32clipboard',
-        'win32gui',
-        'win32pdh',
-        'win32timezone',
-    ],
-    hookspath=[],
-    hooksconfig={},
-    runtime_hooks=[],
-    excludes=[],
-    noarchive=False,
-)
-
-pyz = PYZ(a.pure)
-
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.datas,
-    [],
-    name='TraySerialMonitorClient',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir='C:\\TrayTemp',
-    console=False,
-    disable_windowed_traceback=False,
-    argv_emulation=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-    icon='icon.ico',
-)
-'''
-
-    with open('client.spec', 'w') as f:
-        f.write(spec_content)
-    print("Created client.spec")
-
-def create_installer_spec():
-    """Create PyInstaller spec file for the installer"""
-    spec_content = '''# -*- mode: python ; coding: utf-8 -*-
-
-a = Analysis(
-    ['install_service.py'],
-    pathex=[],
-    binaries=[],
-    datas=[
-        ('icon.ico', '.'),
-    ],
-    hiddenimports=[
-        'win32serviceutil',
-        'win32service',
-        'win32api',
-        'win32con',
-        'win32com.client',
-        'subprocess',
-        'os',
-        'sys',
-        'ctypes',
-    ],
-    hookspath=[],
-    hooksconfig={},
-    runtime_hooks=[],
-    excludes=[],
-    noarchive=False,
-)
-
-pyz = PYZ(a.pure)
-
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.datas,
-    [],
-    name='InstallService',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir='C:\\TrayTemp',
-    console=True,
-    disable_windowed_traceback=False,
-    argv_emulation=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-    icon='icon.ico',
-)
-'''
-
-    with open('installer.spec', 'w') as f:
-        f.write(spec_content)
-    print("Created installer.spec")
-
-def create_uninstaller_spec():
-    """Create PyInstaller spec file for the uninstaller"""
-    spec_content = '''# -*- mode: python ; coding: utf-8 -*-
-
-a = Analysis(
-    ['uninstall_service.py'],
-    pathex=[],
-    binaries=[],
-    datas=[],
-    hiddenimports=[
-        'win32serviceutil',
-        'win32service',
-        'win32api',
-        'subprocess',
-        'os',
-        'sys',
-        'ctypes',
-    ],
-    hookspath=[],
-    hooksconfig={},
-    runtime_hooks=[],
-    excludes=[],
-    noarchive=False,
-)
-
-pyz = PYZ(a.pure)
-
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.datas,
-    [],
-    name='UninstallService',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir='C:\\TrayTemp',
-    console=True,
-    disable_windowed_traceback=False,
-    argv_emulation=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-    icon='icon.ico',
-)
-'''
-
-    with open('uninstaller.spec', 'w') as f:
-        f.write(spec_content)
-    print("Created uninstaller.spec")
-
-def build_executables():
-    """Build all executables"""
-    executables = [
-        ('service.spec', 'Building Windows Service executable'),
-        ('client.spec', 'Building Client GUI executable'),
-        ('installer.spec', 'Building Service Installer executable'),
-        ('uninstaller.spec', 'Building Service Uninstaller executable'),
+    return run_command([sys.executable, '-m', 'pip', 'install', 'pyinstaller'], 'Installing PyInstaller')
+
+def _spec_sections(var, *, entry, name, console, hidden=(), binaries=(),
+                   datas=(('icon.ico', '.'),), icon='icon.ico', dependencies='[]'):
+    """Render the Analysis and EXE sections for one executable"""
+    # UPX roughly doubles link time, so it is only used when BUILD_UPX=1
+    upx = os.environ.get('BUILD_UPX', '0') == '1'
+
+    analysis = _ANALYSIS_TEMPLATE.format(
+        var=var,
+        entry=entry,
+        hidden=tuple(hidden),
+        binaries=list(binaries),
+        datas=list(datas),
+    )
+    exe = _EXE_TEMPLATE.format(
+        var=var,
+        dependencies=dependencies,
+        name=name,
+        console=bool(console),
+        icon=icon,
+        runtime_tmpdir='C:\\TrayTemp',
+        upx=upx,
+        upx_exclude=UPX_EXCLUDE,
+    )
+    return analysis, exe
+
+def render_spec(*, entry, name, console, hidden=(), binaries=(),
+                datas=(('icon.ico', '.'),), icon='icon.ico'):
+    """Render a PyInstaller spec from the shared template"""
+    analysis, exe = _spec_sections(
+        'a', entry=entry, name=name, console=console, hidden=hidden,
+        binaries=binaries, datas=datas, icon=icon,
+    )
+    return _SPEC_HEADER + analysis + exe
+
+def render_merged_spec(targets):
+    """Render one spec that builds every target with a shared MERGE step"""
+    analyses = []
+    exes = []
+    merge_args = []
+    for target in targets:
+        var = f"a_{Path(target['spec']).stem}"
+        analysis, exe = _spec_sections(
+            var,
+            entry=target['entry'],
+            name=target['name'],
+            console=target['console'],
+            hidden=target['hidden'],
+            binaries=target['binaries'],
+            datas=target['datas'],
+            dependencies=f"{var}.dependencies",
+        )
+        analyses.append(analysis)
+        exes.append(exe)
+        merge_args.append(f"    ({var}, {Path(target['entry']).stem!r}, {target['name']!r}),\n")
+
+    # Modules shared between executables are stored once, in the first
+    # executable listed; the others load them from it at runtime
+    merge = "\nMERGE(\n" + "".join(merge_args) + ")\n"
+
+    return _SPEC_HEADER + "".join(analyses) + merge + "".join(exes)
+
+def write_spec_files(specs):
+    """Write (path, content) pairs concurrently, as bytes to skip newline translation"""
+    def write(item):
+        path, content = item
+        Path(path).write_bytes(content.encode('utf-8'))
+        return path
+
+    with ThreadPoolExecutor(max_workers=max(1, len(specs))) as executor:
+        for path in executor.map(write, specs):
+            print(f"Created {path}")
+
+def use_merged_build():
+    """Build all executables from one merged spec (BUILD_MERGE=1)"""
+    return os.environ.get('BUILD_MERGE', '0') == '1'
+
+def spec_inputs(target, icon='icon.ico'):
+    """Files bundled into a target besides its entry script"""
+    files = [src for src, _ in target['binaries']] + [src for src, _ in target['datas']] + [icon]
+    # Local modules the entry script imports (e.g. esp32_port_detector) are
+    # bundled too; hash every script next to the specs rather than track imports
+    files += [str(path) for path in Path('.').glob('*.py')]
+    return sorted(set(files))
+
+def get_build_jobs():
+    """Number of spec builds to run concurrently (BUILD_JOBS, default CPU count)"""
+    try:
+        jobs = int(os.environ.get('BUILD_JOBS', os.cpu_count() or 1))
+    except ValueError:
+        print("[WARNING] Ignoring invalid BUILD_JOBS value")
+        jobs = os.cpu_count() or 1
+    return max(1, jobs)
+
+def build_spec(spec_file, description):
+    """Build a single spec with its own work/dist directories"""
+    # Separate directories (and PyInstaller cache) per spec so that the
+    # --clean of one build cannot remove files another build is using
+    stem = Path(spec_file).stem
+    workpath = Path('build') / stem
+    distpath = Path('dist') / stem
+    env = dict(os.environ, PYINSTALLER_CONFIG_DIR=str(Path('build') / f'{stem}_cache'))
+
+    cmd = [
+        sys.executable, '-m', 'PyInstaller', '--clean',
+        '--workpath', str(workpath),
+        '--distpath', str(distpath),
+        spec_file,
     ]
+    return run_command(cmd, description, env=env, label=stem)
+
+def merge_dist_dirs(spec_files):
+    """Move the per-spec build outputs into dist/"""
+    dist_dir = Path('dist')
+    for spec_file in spec_files:
+        spec_dist = dist_dir / Path(spec_file).stem
+        if not spec_dist.exists():
+            continue
+        for item in spec_dist.iterdir():
+            target = dist_dir / item.name
+            if target.exists():
+                if target.is_dir():
+                    shutil.rmtree(target)
+                else:
+                    target.unlink()
+            shutil.move(str(item), str(target))
+        shutil.rmtree(spec_dist)
+
+def toolchain_id():
+    """Building Python (sys.executable) and every installed package version.
+
+    PyInstaller bundles the installed packages (pywin32, pycaw, pythonnet,
+    ...), so upgrading any of them, or PyInstaller itself, invalidates the cache.
+    """
+    packages = sorted(
+        f"{dist.metadata['Name']}=={dist.version}".lower()
+        for dist in distributions()
+        if dist.metadata['Name']
+    )
+    return "|".join([sys.version, *packages])
+
+def compute_spec_fingerprint(spec_file, entry_py, inputs=()):
+    """Hash the toolchain, spec (hidden imports, binaries, datas, options), entry script and input files"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(toolchain_id().encode('utf-8'))
+    for path in (spec_file, entry_py, *sorted(inputs)):
+        h.update(path.encode('utf-8'))
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(65536), b''):
+                    h.update(chunk)
+        except FileNotFoundError:
+            h.update(b'<missing>')
+    return h.hexdigest()
+
+def load_build_cache():
+    """Load the build cache, or an empty one if it is missing or unreadable"""
+    try:
+        with open(BUILD_CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_build_cache(fingerprints):
+    """Record the fingerprint and exe/ stat of every organized executable"""
+    cache = {}
+    for target in BUILD_TARGETS:
+        exe_path = Path('exe') / f"{target['name']}.exe"
+        if target['spec'] not in fingerprints or not exe_path.exists():
+            continue
+        stat = exe_path.stat()
+        cache[target['spec']] = {
+            'digest': fingerprints[target['spec']],
+            'exe_mtime': stat.st_mtime,
+            'exe_size': stat.st_size,
+        }
+
+    with open(BUILD_CACHE_FILE, 'w') as f:
+        json.dump(cache, f, indent=2)
+
+def is_cache_hit(entry, digest, exe_path):
+    """Check a cache entry against the current fingerprint and the existing exe"""
+    if not entry or entry.get('digest') != digest:
+        return False
+    try:
+        stat = exe_path.stat()
+    except FileNotFoundError:
+        return False
+    return stat.st_mtime == entry.get('exe_mtime') and stat.st_size == entry.get('exe_size')
+
+def build_executables(force=False):
+    """Build all executables, returning their fingerprints (None on failure)"""
+    cache = {} if force else load_build_cache()
+    merged = use_merged_build()
+    fingerprints = {}
+    pending = []
+
+    for target in BUILD_TARGETS:
+        spec_file = MERGED_SPEC if merged else target['spec']
+        digest = compute_spec_fingerprint(spec_file, target['entry'], spec_inputs(target))
+        fingerprints[target['spec']] = digest
+
+        exe_path = Path('exe') / f"{target['name']}.exe"
+        if is_cache_hit(cache.get(target['spec']), digest, exe_path):
+            print(f"[CACHE HIT] skipping {target['spec']}")
+        else:
+            pending.append(target)
+
+    if not pending:
+        return fingerprints
 
     # Create dist directory if it doesn't exist
     os.makedirs('dist', exist_ok=True)
 
-    for spec_file, description in executables:
-        if not run_command(f'python -m PyInstaller --clean {spec_file}', description):
-            return False
+    if merged:
+        # The executables share modules, so any change rebuilds all of them
+        if not build_spec(MERGED_SPEC, 'Building all executables from merged spec'):
+            return None
+        merge_dist_dirs([MERGED_SPEC])
+        return fingerprints
+
+    # The spec files are independent, so build them concurrently
+    jobs = min(get_build_jobs(), len(pending))
+    print(f"Running {jobs} parallel build job(s)")
+
+    success = True
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(build_spec, target['spec'], target['description']): target['spec']
+            for target in pending
+        }
+        for future in as_completed(futures):
+            try:
+                if not future.result():
+                    success = False
+            except Exception as e:
+                print(f"[ERROR] Building {futures[future]} failed: {e}")
+                success = False
+
+    if not success:
+        return None
+
+    merge_dist_dirs(target['spec'] for target in pending)
+    return fingerprints
+
+def _fastcopy(src, dst):
+    """Hardlink src to dst, falling back to a real copy (e.g. across volumes)"""
+    # Remove dst first: writing through an existing hardlink would modify src
+    try:
+        os.unlink(dst)
+    except FileNotFoundError:
+        pass
 
-    return True
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
 
 def organize_executables():
     """Organize built executables into a clean structure"""
     print("\nOrganizing executables...")
 
-    # Create exe directory
+    # Create exe directory; it is kept between builds so cached executables survive
     exe_dir = Path('exe')
-    if exe_dir.exists():
-        shutil.rmtree(exe_dir)
-    exe_dir.mkdir()
+    exe_dir.mkdir(exist_ok=True)
 
     # Copy executables
-    executables = [
-        ('TrayHardwareMonitorService.exe', 'TrayHardwareMonitorService.exe'),
-        ('TraySerialMonitorClient.exe', 'TraySerialMonitorClient.exe'),
-        ('InstallService.exe', 'InstallService.exe'),
-        ('UninstallService.exe', 'UninstallService.exe'),
-    ]
-
-    for exe_name, target_name in executables:
+    for target in BUILD_TARGETS:
+        exe_name = f"{target['name']}.exe"
         src = Path('dist') / exe_name
-        dst = exe_dir / target_name
+        dst = exe_dir / exe_name
 
         if src.exists():
-            shutil.copy2(src, dst)
-            print(f"[OK] Copied {exe_name} -> exe/{target_name}")
+            _fastcopy(src, dst)
+            print(f"[OK] Copied {exe_name} -> exe/{exe_name}")
+        elif dst.exists():
+            print(f"[OK] exe/{exe_name} is up to date")
         else:
             print(f"[ERROR] Missing {exe_name}")
             return False
@@ -367,40 +477,53 @@ def organize_executables():
         dst = exe_dir / file_name
 
         if src.exists():
-            shutil.copy2(src, dst)
+            _fastcopy(src, dst)
             print(f"[OK] Copied {file_name}")
         else:
             print(f"[WARNING] Missing {file_name} (optional)")
 
     return True
 
+def _remove_trees(dirs):
+    """Remove directory trees, using the native rmdir on Windows"""
+    if not dirs:
+        return
+    if os.name == 'nt':
+        # One rmdir call removes everything without a Python round-trip per file
+        subprocess.run(['cmd', '/c', 'rmdir', '/s', '/q', *dirs], capture_output=True)
+    for path in dirs:
+        try:
+            shutil.rmtree(path)
+        except FileNotFoundError:
+            pass
+
 def cleanup_build_files():
     """Clean up build artifacts"""
     print("\nCleaning up build files...")
 
-    cleanup_items = [
-        'build',
-        'dist',
-        '*.spec',
-        '__pycache__',
-    ]
+    cleanup_dirs = {'build', 'dist', '__pycache__'}
 
-    for item in cleanup_items:
-        if '*' in item:
-            # Handle wildcards
-            import glob
-            for path in glob.glob(item):
-                if os.path.isfile(path):
-                    os.remove(path)
-                    print(f"[OK] Removed {path}")
-        else:
-            path = Path(item)
-            if path.exists():
-                if path.is_dir():
-                    shutil.rmtree(path)
-                else:
-                    path.unlink()
-                print(f"[OK] Removed {path}")
+    # Collect everything in a single directory pass
+    files = []
+    dirs = []
+    with os.scandir('.') as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in cleanup_dirs:
+                    dirs.append(entry.name)
+            elif entry.name.endswith('.spec'):
+                files.append(entry.name)
+
+    for path in files:
+        try:
+            os.remove(path)
+            print(f"[OK] Removed {path}")
+        except FileNotFoundError:
+            pass
+
+    _remove_trees(dirs)
+    for path in dirs:
+        print(f"[OK] Removed {path}")
 
 def main():
     """Main build process"""
@@ -423,14 +546,26 @@ def main():
 
     # Create spec files
     print("\nCreating PyInstaller spec files...")
-    create_service_spec()
-    create_client_spec()
-    create_installer_spec()
-    create_uninstaller_spec()
-
-    # Build executables
+    if use_merged_build():
+        specs = [(MERGED_SPEC, render_merged_spec(BUILD_TARGETS))]
+    else:
+        specs = [
+            (target['spec'], render_spec(
+                entry=target['entry'],
+                name=target['name'],
+                console=target['console'],
+                hidden=target['hidden'],
+                binaries=target['binaries'],
+                datas=target['datas'],
+            ))
+            for target in BUILD_TARGETS
+        ]
+    write_spec_files(specs)
+
+    # Build executables (--force ignores the build cache)
     print("\nBuilding executables...")
-    if not build_executables():
+    fingerprints = build_executables(force='--force' in sys.argv[1:])
+    if fingerprints is None:
         print("\n[ERROR] Build failed!")
         return False
 
@@ -439,6 +574,8 @@ def main():
         print("\n[ERROR] Failed to organize executables!")
         return False
 
+    save_build_cache(fingerprints)
+
     # Cleanup
     cleanup_build_files()
 
@@ -4,13 +4,17 @@ This service runs with SYSTEM privileges and handles hardware monitoring.
 It exposes data via named pipe for the tray client to consume.
 """
 
-import json
+import re
+import struct
 import threading
 import time
 import sys
 import os
-from datetime import datetime
 import ctypes
+
+# Make pythoncom/comtypes initialize COM as multithreaded (MTA) in the thread
+# that imports them, matching the worker threads; must precede their import
+sys.coinit_flags = 0  # COINIT_MULTITHREADED
 import win32serviceutil
 import win32service
 import win32event
@@ -18,71 +22,231 @@ import servicemanager
 import win32pipe
 import win32file
 import pywintypes
+import pythoncom
+import winerror
 
 import psutil
 
 # For master volume
 from ctypes import POINTER, cast
-from comtypes import CLSCTX_ALL
+from comtypes import CLSCTX_ALL, COMObject
 from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+from pycaw.api.endpointvolume import IAudioEndpointVolumeCallback
+from pycaw.api.mmdeviceapi import IMMNotificationClient
+from pycaw.constants import EDataFlow, ERole
 
 # For CPU temperature via LibreHardwareMonitor
 import clr
 
-# Monkey-patch comtypes destructor to suppress access violations on release
-import comtypes
-from comtypes._post_coinit.unknwn import _compointer_base
-_orig_del = _compointer_base.__del__
-def _safe_del(self):
-    try:
-        _orig_del(self)
-    except Exception:
-        pass
-_compointer_base.__del__ = _safe_del
+
+# Pipe message sent to clients once per second: version, CPU load (%), master
+# volume (%), CPU temperature (°C). Keep in sync with tray_serial_monitor_client.py
+PIPE_FRAME = struct.Struct("<BBBH")
+PIPE_FRAME_VERSION = 1
+
+
+# Keywords in temperature sensor names that cache_temperature_sensors() ranks by
+_SENSOR_RE = re.compile(r"tctl|tdie|package|core|cpu|processor", re.I)
+_TCTL_KEYWORDS = frozenset(("tctl", "tdie"))
+_CPU_KEYWORDS = frozenset(("cpu", "processor", "core"))  # CPU sensors on the motherboard
+
+
+# PDH (Performance Data Helper) definitions used by WindowsCPUMonitor
+PDH_FMT_DOUBLE = 0x00000200
+ERROR_SUCCESS = 0
+
+# Same counter Task Manager uses; accounts for boost clocks and hybrid cores
+# unlike the GetSystemTimes-based numbers psutil reports
+PDH_CPU_COUNTERS = (
+    r"\Processor Information(_Total)\% Processor Utility",
+    r"\Processor Information(_Total)\% Processor Time",
+)
+
+
+class PDH_FMT_COUNTERVALUE(ctypes.Structure):
+    class _Value(ctypes.Union):
+        _fields_ = [
+            ('longValue', ctypes.c_long),
+            ('doubleValue', ctypes.c_double),
+            ('largeValue', ctypes.c_longlong),
+            ('AnsiStringValue', ctypes.c_char_p),
+            ('WideStringValue', ctypes.c_wchar_p),
+        ]
+
+    _anonymous_ = ('value',)
+    _fields_ = [
+        ('CStatus', ctypes.c_ulong),
+        ('value', _Value),
+    ]
 
 
 class WindowsCPUMonitor:
-    """Simple psutil-based CPU monitoring"""
+    """CPU monitoring via a PDH counter, falling back to psutil"""
     
+    # Samples closer together than this return the previous value; both PDH
+    # and psutil need some time between calls to produce a meaningful delta
+    MIN_SAMPLE_INTERVAL = 0.1
+
     def __init__(self):
         self.initialized = False
         self.last_cpu_value = 0
+        self.last_sample_time = 0.0
+        self.last_error = None
+        self.pdh = None
+        self.query = None
+        self.counter = None
         
+    def init_pdh(self):
+        """Open a PDH query for the total CPU utility counter"""
+        pdh = ctypes.WinDLL("pdh")
+        query = ctypes.c_void_p()
+        status = pdh.PdhOpenQueryW(None, 0, ctypes.byref(query))
+        if status != ERROR_SUCCESS:
+            raise OSError(f"PdhOpenQueryW failed (0x{status & 0xFFFFFFFF:08X})")
+
+        for path in PDH_CPU_COUNTERS:
+            counter = ctypes.c_void_p()
+            status = pdh.PdhAddEnglishCounterW(query, path, 0, ctypes.byref(counter))
+            if status == ERROR_SUCCESS:
+                break
+        else:
+            pdh.PdhCloseQuery(query)
+            raise OSError(f"PdhAddEnglishCounterW failed (0x{status & 0xFFFFFFFF:08X})")
+
+        # Rate counters need two collections; this is the first one
+        pdh.PdhCollectQueryData(query)
+
+        self.pdh = pdh
+        self.query = query
+        self.counter = counter
+        return path
+
     def initialize(self):
-        """Initialize psutil CPU monitoring"""
+        """Initialize CPU monitoring"""
         try:
-            servicemanager.LogInfoMsg("Initializing psutil CPU monitoring...")
+            source = "psutil"
+            try:
+                source = f"PDH counter {self.init_pdh()}"
+            except Exception as e:
+                servicemanager.LogErrorMsg(f"PDH CPU counter unavailable, using psutil: {e}")
             
             # Prime psutil CPU counter
             psutil.cpu_percent(interval=None)
+            self.last_sample_time = time.monotonic()
             
             self.initialized = True
-            servicemanager.LogInfoMsg("psutil CPU monitoring initialized successfully")
+            servicemanager.LogInfoMsg(f"CPU monitoring initialized using {source}")
             return True
             
         except Exception as e:
-            servicemanager.LogErrorMsg(f"Failed to initialize psutil CPU monitoring: {e}")
+            servicemanager.LogErrorMsg(f"Failed to initialize CPU monitoring: {e}")
             return False
+
+    def read_pdh(self):
+        """Collect and read the PDH counter, or None if there is no valid sample"""
+        if self.pdh.PdhCollectQueryData(self.query) != ERROR_SUCCESS:
+            return None
+
+        value = PDH_FMT_COUNTERVALUE()
+        status = self.pdh.PdhGetFormattedCounterValue(
+            self.counter, PDH_FMT_DOUBLE, None, ctypes.byref(value)
+        )
+        if status != ERROR_SUCCESS:
+            return None
+        return value.doubleValue
     
     def get_cpu_usage(self):
-        """Get CPU usage using standard psutil"""
+        """Get CPU usage from PDH, or psutil if PDH is not available"""
         try:
-            # Use standard psutil with 0.3 second interval (original implementation)
-            cpu_percent = psutil.cpu_percent(interval=0.3)
-            self.last_cpu_value = int(round(cpu_percent))
+            now = time.monotonic()
+            if now - self.last_sample_time < self.MIN_SAMPLE_INTERVAL:
+                return self.last_cpu_value
+
+            cpu_percent = self.read_pdh() if self.query else None
+            if cpu_percent is None:
+                # Non-blocking: usage since the previous call, so the caller's
+                # polling cadence sets the sampling window
+                cpu_percent = psutil.cpu_percent(interval=None)
+            self.last_sample_time = now
+            # Processor Utility exceeds 100 when boosting; Task Manager caps it too
+            self.last_cpu_value = min(int(round(cpu_percent)), 100)
+            self.last_error = None
             return self.last_cpu_value
                 
         except Exception as e:
-            servicemanager.LogErrorMsg(f"Error in psutil CPU monitoring: {e}")
+            # Only log when the error changes, not once per sample
+            if str(e) != self.last_error:
+                self.last_error = str(e)
+                servicemanager.LogErrorMsg(f"Error in CPU monitoring: {e}")
             return self.last_cpu_value
     
     def cleanup(self):
         """Clean up CPU monitor resources"""
         try:
+            if self.query:
+                self.pdh.PdhCloseQuery(self.query)
+                self.query = None
+                self.counter = None
             self.initialized = False
-            servicemanager.LogInfoMsg("psutil CPU monitor cleaned up")
+            servicemanager.LogInfoMsg("CPU monitor cleaned up")
         except Exception as e:
-            servicemanager.LogErrorMsg(f"Error cleaning up psutil CPU monitor: {e}")
+            servicemanager.LogErrorMsg(f"Error cleaning up CPU monitor: {e}")
+
+
+def init_com_thread():
+    """Join the calling thread to the multithreaded apartment.
+
+    Returns True when the caller must balance it with CoUninitialize().
+    """
+    try:
+        pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+        return True
+    except pythoncom.com_error as e:
+        if e.hresult != winerror.RPC_E_CHANGED_MODE:
+            raise
+        # Already initialized as single-threaded by someone else; COM still works
+        servicemanager.LogErrorMsg("COM already initialized as single-threaded apartment on this thread")
+        return False
+
+
+class VolumeChangeCallback(COMObject):
+    """IAudioEndpointVolumeCallback that reports master volume changes"""
+    _com_interfaces_ = [IAudioEndpointVolumeCallback]
+
+    def __init__(self, on_change):
+        super().__init__()
+        self.on_change = on_change
+
+    def OnNotify(self, pNotify):
+        # Called on an audio engine thread whenever the volume or mute state changes
+        self.on_change(pNotify.contents.fMasterVolume)
+
+
+class EndpointChangeCallback(COMObject):
+    """IMMNotificationClient that reports changes to the audio output devices"""
+    _com_interfaces_ = [IMMNotificationClient]
+
+    def __init__(self, on_change):
+        super().__init__()
+        self.on_change = on_change
+
+    # Called on a system thread; no COM calls on the enumerator may be made here
+    def OnDefaultDeviceChanged(self, flow, role, pwstrDefaultDeviceId):
+        if flow == EDataFlow.eRender.value:
+            self.on_change()
+
+    def OnDeviceStateChanged(self, pwstrDeviceId, dwNewState):
+        # Covers the active device being unplugged or disabled
+        self.on_change()
+
+    def OnDeviceAdded(self, pwstrDeviceId):
+        pass
+
+    def OnDeviceRemoved(self, pwstrDeviceId):
+        pass
+
+    def OnPropertyValueChanged(self, pwstrDeviceId, key):
+        pass
 
 
 class HardwareMonitorService(win32serviceutil.ServiceFramework):
@@ -90,352 +254,501 @@ class HardwareMonitorService(win32serviceutil.ServiceFramework):
     _svc_display_name_ = "Tray Hardware Monitor Service"
     _svc_description_ = "Hardware monitoring service for Tray Serial Monitor"
 
+    # Clients polling within this many seconds of each other share one sample
+    SAMPLE_MAX_AGE = 0.5
+
     def __init__(self, args):
         win32serviceutil.ServiceFramework.__init__(self, args)
-        self.hWaitStop = win32event.CreateEvent(None, 0, 0, None)
+        # Manual reset: both SvcDoRun and the pipe thread wait on it
+        self.hWaitStop = win32event.CreateEvent(None, 1, 0, None)
         self.stop_event = threading.Event()
         self.pipe_name = r'\\.\pipe\TrayHardwareMonitor'
-        self.current_data = {}
-        self.data_lock = threading.Lock()
+        self.collect_lock = threading.Lock()  # One collection at a time across clients
+        self._last_sample = (float('-inf'), None)  # (monotonic time, data), see current_sample()
         self.computer = None
         self.Hardware = None  # Store Hardware module reference
-        self.cpu_monitor = WindowsCPUMonitor()  # Simple psutil CPU monitor
+        # Temperature sensors selected once by cache_temperature_sensors()
+        self._preferred_temp_sensor = None
+        self._core_temp_sensors = []
+        self._fallback_temp_sensors = []
+        self._temp_hardware = []  # Hardware owning the selected sensors
+        self._last_update_ns = 0  # monotonic_ns of the last _tick_update() refresh
+        # Bound Value getters for the sensors above, see sensor_value_getter()
+        self._get_preferred_temp = None
+        self._core_temp_getters = []
+        self._fallback_temp_getters = []
+        # Per-sample logging only in debug mode ("hardware_monitor_service.py debug");
+        # otherwise readings are only logged when their state changes
+        self._debug = servicemanager.Debugging()
+        self._last_log_state = {}
+        # Set up by init_audio(); the callback keeps _cached_volume current
+        self._volume_iface = None
+        self._volume_callback = None
+        self._cached_volume = 0
+        # Device changes set _audio_stale, so the next read re-initializes audio
+        self._device_enumerator = None
+        self._endpoint_callback = None
+        self._audio_stale = False
+        self.cpu_monitor = WindowsCPUMonitor()  # PDH/psutil CPU monitor
         
         # Don't initialize LibreHardwareMonitor here - do it in SvcDoRun instead
         # This allows the Windows Service framework to be fully initialized first
         
     def init_hardware_monitor(self):
         """Initialize LibreHardwareMonitor"""
+        # Progress is logged as one event log entry at the end; errors are
+        # logged separately as they happen
+        msgs = ["=== INITIALIZING LIBREHARDWAREMONITOR ==="]
         try:
-            servicemanager.LogInfoMsg("=== INITIALIZING LIBREHARDWAREMONITOR ===")
-            
             # Get the directory where the service is running
             # Handle both PyInstaller executable and development environments
             if getattr(sys, 'frozen', False):
                 # Running as PyInstaller executable
                 service_dir = os.path.dirname(sys.executable)
-                servicemanager.LogInfoMsg(f"Running as PyInstaller executable")
-                servicemanager.LogInfoMsg(f"Executable path: {sys.executable}")
-                servicemanager.LogInfoMsg(f"Service directory: {service_dir}")
+                msgs.append(f"Running as PyInstaller executable")
+                msgs.append(f"Executable path: {sys.executable}")
             else:
                 # Running as Python script
                 service_dir = os.path.dirname(os.path.abspath(__file__))
-                servicemanager.LogInfoMsg(f"Running as Python script")
-                servicemanager.LogInfoMsg(f"Script path: {__file__}")
-                servicemanager.LogInfoMsg(f"Service directory: {service_dir}")
+                msgs.append(f"Running as Python script")
+                msgs.append(f"Script path: {__file__}")
+            msgs.append(f"Service directory: {service_dir}")
             
             dll_path = os.path.join(service_dir, "LibreHardwareMonitorLib.dll")
-            servicemanager.LogInfoMsg(f"Looking for DLL at: {dll_path}")
             
             if not os.path.exists(dll_path):
                 servicemanager.LogErrorMsg(f"LibreHardwareMonitorLib.dll not found at {dll_path}")
                 # List files in the service directory for debugging
                 try:
                     files_in_dir = os.listdir(service_dir)
-                    servicemanager.LogInfoMsg(f"Files in service directory:")
-                    for file in sorted(files_in_dir):
-                        servicemanager.LogInfoMsg(f"  - {file}")
+                    msgs.append(f"Files in service directory:")
+                    msgs.extend(f"  - {file}" for file in sorted(files_in_dir))
                 except Exception as e:
                     servicemanager.LogErrorMsg(f"Could not list service directory: {e}")
+                msgs.append("=== LIBREHARDWAREMONITOR INITIALIZATION FAILED ===")
                 return
                 
-            servicemanager.LogInfoMsg(f"Found LibreHardwareMonitorLib.dll")
-            servicemanager.LogInfoMsg(f"Loading DLL from: {dll_path}")
+            msgs.append(f"Loading DLL from: {dll_path}")
             
+            # AddReference with a full path loads the assembly directly from
+            # that file without probing
             clr.AddReference(dll_path)
             from LibreHardwareMonitor import Hardware
-            servicemanager.LogInfoMsg(f"Successfully loaded LibreHardwareMonitor assembly")
+            msgs.append(f"Successfully loaded LibreHardwareMonitor assembly")
             
             # Store Hardware module reference for use in other methods
             self.Hardware = Hardware
             
-            # Initialize LHM with comprehensive settings
-            servicemanager.LogInfoMsg(f"Initializing Hardware.Computer()...")
+            # Initialize LHM with only the hardware the service reads from
             self.computer = Hardware.Computer()
             self.computer.IsCpuEnabled = True
-            self.computer.IsGpuEnabled = True
-            self.computer.IsMemoryEnabled = True
-            self.computer.IsMotherboardEnabled = True
+            self.computer.IsGpuEnabled = False
+            self.computer.IsMemoryEnabled = False
+            self.computer.IsMotherboardEnabled = True  # CPU-labelled sensors are the temperature fallback
             self.computer.IsControllerEnabled = False  # Disable controller sensors (requires HidSharp.dll)
-            self.computer.IsStorageEnabled = True      # Enable storage sensors
+            self.computer.IsStorageEnabled = False
             
-            servicemanager.LogInfoMsg(f"Opening hardware monitoring...")
             self.computer.Open()
-            servicemanager.LogInfoMsg(f"Hardware monitoring opened successfully")
+            msgs.append(f"Hardware monitoring opened successfully")
             
             # Force an initial update to populate sensors
-            servicemanager.LogInfoMsg(f"Performing initial sensor update...")
             for hw in self.computer.Hardware:
                 hw.Update()
                 for subhw in hw.SubHardware:
                     subhw.Update()
             
-            servicemanager.LogInfoMsg("LibreHardwareMonitor initialized successfully")
-            servicemanager.LogInfoMsg("=== LIBREHARDWAREMONITOR INITIALIZATION COMPLETE ===")
+            # The sensor topology is fixed after Open(), so pick the sensors once
+            self.cache_temperature_sensors()
+            
+            msgs.append("=== LIBREHARDWAREMONITOR INITIALIZATION COMPLETE ===")
             
         except Exception as e:
             servicemanager.LogErrorMsg(f"Failed to initialize LibreHardwareMonitor: {e}")
             import traceback
             servicemanager.LogErrorMsg(f"LHM init error traceback: {traceback.format_exc()}")
             self.computer = None
-            servicemanager.LogInfoMsg("=== LIBREHARDWAREMONITOR INITIALIZATION FAILED ===")
+            msgs.append("=== LIBREHARDWAREMONITOR INITIALIZATION FAILED ===")
+        finally:
+            servicemanager.LogInfoMsg("\n".join(msgs))
+
+    def cache_temperature_sensors(self):
+        """Select the CPU temperature sensors to read, in order of preference.
+
+        Preferred is Core (Tctl/Tdie), then any Tctl/Tdie, then Package. If
+        none of these has a value the CPU core sensors are averaged, and as a
+        last resort any other CPU or CPU-labelled motherboard sensor is used.
+        """
+        Hardware = self.Hardware
+        preferred = {}  # priority -> sensor; lower is better
+        cores = []
+        fallbacks = []
+        owners = []
+
+        def temperature_sensors(hw):
+            return [s for s in hw.Sensors if s.SensorType == Hardware.SensorType.Temperature]
+
+        def sensor_keywords(sensor):
+            # One regex pass over the name instead of a substring test per keyword
+            return {keyword.lower() for keyword in _SENSOR_RE.findall(sensor.Name)}
+
+        for hw in self.computer.Hardware:
+            if hw.HardwareType == Hardware.HardwareType.Cpu:
+                groups = [(hw, temperature_sensors(hw))]
+                groups += [(subhw, temperature_sensors(subhw)) for subhw in hw.SubHardware]
+                for owner, sensors in groups:
+                    for sensor in sensors:
+                        keywords = sensor_keywords(sensor)
+                        if keywords & _TCTL_KEYWORDS:
+                            preferred.setdefault(0 if "core" in keywords else 1, sensor)
+                        elif "package" in keywords:
+                            preferred.setdefault(2, sensor)
+                        elif "core" in keywords:
+                            cores.append(sensor)
+                        else:
+                            fallbacks.append(sensor)
+                    if sensors and owner not in owners:
+                        owners.append(owner)
+
+            # Also check motherboard sensors for CPU temperature
+            elif hw.HardwareType == Hardware.HardwareType.Motherboard:
+                for owner in [hw] + list(hw.SubHardware):
+                    sensors = [s for s in temperature_sensors(owner) if sensor_keywords(s) & _CPU_KEYWORDS]
+                    fallbacks.extend(sensors)
+                    if sensors and owner not in owners:
+                        owners.append(owner)
+
+        self._preferred_temp_sensor = preferred[min(preferred)] if preferred else None
+        self._core_temp_sensors = cores
+        self._fallback_temp_sensors = fallbacks
+        self._temp_hardware = owners
+
+        # Bind the Value getters once; they are called every second
+        self._get_preferred_temp = None
+        if self._preferred_temp_sensor is not None:
+            self._get_preferred_temp = self.sensor_value_getter(self._preferred_temp_sensor)
+        self._core_temp_getters = [self.sensor_value_getter(s) for s in cores]
+        self._fallback_temp_getters = [self.sensor_value_getter(s) for s in fallbacks]
+
+        if self._preferred_temp_sensor is not None:
+            servicemanager.LogInfoMsg(f"Using temperature sensor: {self._preferred_temp_sensor.Name}")
+        elif cores:
+            servicemanager.LogInfoMsg(f"Using average of {len(cores)} core temperature sensors")
+        elif fallbacks:
+            servicemanager.LogInfoMsg(f"Using fallback temperature sensor: {fallbacks[0].Name}")
+        else:
+            servicemanager.LogErrorMsg("No temperature sensors found!")
+
+    def sensor_value_getter(self, sensor):
+        """Return a callable reading sensor.Value through a bound .NET delegate.
+
+        Invoking the delegate skips pythonnet's per-access attribute lookup on
+        the sensor; falls back to the plain property if it cannot be created.
+        """
+        try:
+            from System import Delegate, Func, Nullable, Single
+            getter = clr.GetClrType(self.Hardware.ISensor).GetProperty("Value").GetGetMethod()
+            delegate_type = clr.GetClrType(Func[Nullable[Single]])
+            return Delegate.CreateDelegate(delegate_type, sensor, getter)
+        except Exception as e:
+            servicemanager.LogErrorMsg(f"Could not bind value getter for {sensor.Name}: {e}")
+            return lambda: sensor.Value
+
+    def log_state(self, source, error=None):
+        """Log a reading's first success, each new error and its recovery, once"""
+        previous = self._last_log_state.get(source, ())
+        if previous == error:
+            return
+        self._last_log_state[source] = error
+
+        if error:
+            servicemanager.LogErrorMsg(error)
+        elif previous:
+            servicemanager.LogInfoMsg(f"{source} reading recovered")
+        else:
+            servicemanager.LogInfoMsg(f"{source} reading available")
+
+    def _tick_update(self, max_age_ms=200):
+        """Refresh the hardware owning the selected sensors, at most once per sample.
+
+        Readings taken within max_age_ms of the last refresh share it.
+        """
+        now = time.monotonic_ns()
+        if now - self._last_update_ns > max_age_ms * 1_000_000:
+            for hw in self._temp_hardware:
+                hw.Update()
+            self._last_update_ns = now
 
     def get_cpu_temperature(self):
         """Get CPU temperature using real hardware monitoring."""
-        if not self.computer or not self.Hardware:
-            servicemanager.LogErrorMsg("LibreHardwareMonitor not initialized - cannot get real temperature")
+        if not self.computer or not self._temp_hardware:
             return 0  # Return 0 to indicate failure, not fake data
-            
-        temp = None
-        package_temp = None
-        core_temp = None
-        all_temps = []
 
+        temp = None
         try:
-            # Use stored Hardware module reference
-            Hardware = self.Hardware
-            
-            # Update all hardware first
-            for hw in self.computer.Hardware:
-                hw.Update()
-                # Also update sub-hardware (important for some motherboards)
-                for subhw in hw.SubHardware:
-                    subhw.Update()
-            
-            for hw in self.computer.Hardware:
-                if hw.HardwareType == Hardware.HardwareType.Cpu:
-                    servicemanager.LogInfoMsg(f"Found CPU hardware: {hw.Name}")
-                    
-                    # Check main CPU sensors
-                    for sensor in hw.Sensors:
-                        if sensor.SensorType == Hardware.SensorType.Temperature:
-                            if sensor.Value is not None:
-                                sensor_temp = float(sensor.Value)
-                                sensor_name = sensor.Name
-                                all_temps.append(f"{sensor_name}: {sensor_temp}°C")
-                                
-                                servicemanager.LogInfoMsg(f"Temperature sensor: {sensor_name} = {sensor_temp}°C")
-                                
-                                # Prioritize "Core (Tctl/Tdie)" sensor specifically (most accurate for AMD Ryzen)
-                                if ("tctl" in sensor_name.lower() or "tdie" in sensor_name.lower()) and "core" in sensor_name.lower():
-                                    package_temp = sensor_temp  # This is our preferred sensor
-                                    servicemanager.LogInfoMsg(f"Found preferred Core (Tctl/Tdie) temperature: {sensor_temp}°C")
-                                # Then any other Tctl/Tdie temperature
-                                elif "tctl" in sensor_name.lower() or "tdie" in sensor_name.lower():
-                                    if package_temp is None:  # Only use if we don't have Core (Tctl/Tdie)
-                                        package_temp = sensor_temp
-                                        servicemanager.LogInfoMsg(f"Found AMD Tctl/Tdie temperature: {sensor_temp}°C")
-                                # Then Package temperature
-                                elif "package" in sensor_name.lower() and sensor_temp > 0:
-                                    if package_temp is None:  # Only use if we don't have Tctl/Tdie
-                                        package_temp = sensor_temp
-                                        servicemanager.LogInfoMsg(f"Found Package temperature: {sensor_temp}°C")
-                                # Then other Core temperatures (use average or first valid core)
-                                elif "core" in sensor_name.lower() and sensor_temp > 0:
-                                    if core_temp is None:
-                                        core_temp = sensor_temp
-                                    else:
-                                        # Average with existing core temp
-                                        core_temp = (core_temp + sensor_temp) / 2
-                                    servicemanager.LogInfoMsg(f"Found Core temperature: {sensor_temp}°C (avg: {core_temp}°C)")
-                                # Any other temperature as fallback
-                                elif sensor_temp > 0 and temp is None:
-                                    temp = sensor_temp
-                                    servicemanager.LogInfoMsg(f"Found other temperature: {sensor_temp}°C")
-                    
-                    # Check sub-hardware sensors (some CPUs report temps here)
-                    for subhw in hw.SubHardware:
-                        servicemanager.LogInfoMsg(f"Checking sub-hardware: {subhw.Name}")
-                        for sensor in subhw.Sensors:
-                            if sensor.SensorType == Hardware.SensorType.Temperature:
-                                if sensor.Value is not None:
-                                    sensor_temp = float(sensor.Value)
-                                    sensor_name = f"{subhw.Name} - {sensor.Name}"
-                                    all_temps.append(f"{sensor_name}: {sensor_temp}°C")
-                                    
-                                    servicemanager.LogInfoMsg(f"Sub-hardware temperature sensor: {sensor_name} = {sensor_temp}°C")
-                                    
-                                    if "package" in sensor.Name.lower() and sensor_temp > 0:
-                                        package_temp = sensor_temp
-                                    elif "core" in sensor.Name.lower() and sensor_temp > 0:
-                                        if core_temp is None:
-                                            core_temp = sensor_temp
-                                        else:
-                                            core_temp = (core_temp + sensor_temp) / 2
-                                    elif sensor_temp > 0 and temp is None:
-                                        temp = sensor_temp
-
-                # Also check motherboard sensors for CPU temperature
-                elif hw.HardwareType == Hardware.HardwareType.Motherboard:
-                    servicemanager.LogInfoMsg(f"Checking motherboard hardware: {hw.Name}")
-                    for sensor in hw.Sensors:
-                        if sensor.SensorType == Hardware.SensorType.Temperature:
-                            if sensor.Value is not None:
-                                sensor_temp = float(sensor.Value)
-                                sensor_name = f"MB - {sensor.Name}"
-                                
-                                # Look for CPU-related temperature sensors on motherboard
-                                if any(keyword in sensor.Name.lower() for keyword in ["cpu", "processor", "core"]):
-                                    all_temps.append(f"{sensor_name}: {sensor_temp}°C")
-                                    servicemanager.LogInfoMsg(f"Motherboard CPU temperature sensor: {sensor_name} = {sensor_temp}°C")
-                                    
-                                    if sensor_temp > 0 and temp is None:
-                                        temp = sensor_temp
-                    
-                    # Check motherboard sub-hardware
-                    for subhw in hw.SubHardware:
-                        servicemanager.LogInfoMsg(f"Checking motherboard sub-hardware: {subhw.Name}")
-                        for sensor in subhw.Sensors:
-                            if sensor.SensorType == Hardware.SensorType.Temperature:
-                                if sensor.Value is not None:
-                                    sensor_temp = float(sensor.Value)
-                                    sensor_name = f"MB-{subhw.Name} - {sensor.Name}"
-                                    
-                                    if any(keyword in sensor.Name.lower() for keyword in ["cpu", "processor", "core"]):
-                                        all_temps.append(f"{sensor_name}: {sensor_temp}°C")
-                                        servicemanager.LogInfoMsg(f"Motherboard sub-hardware CPU temperature: {sensor_name} = {sensor_temp}°C")
-                                        
-                                        if sensor_temp > 0 and temp is None:
-                                            temp = sensor_temp
-
-            # Determine the best temperature to use
-            if package_temp is not None:
-                temp = package_temp
-                servicemanager.LogInfoMsg(f"Using Package temperature: {temp}°C")
-            elif core_temp is not None:
-                temp = core_temp
-                servicemanager.LogInfoMsg(f"Using Core temperature: {temp}°C")
-                        
-            if all_temps:
-                servicemanager.LogInfoMsg(f"All temperature sensors found: {', '.join(all_temps)}")
-            else:
-                servicemanager.LogErrorMsg("No temperature sensors found!")
-                        
+            self._tick_update()
+
+            if self._get_preferred_temp is not None:
+                temp = self._get_preferred_temp()
+
+            if not temp:
+                values = [v for v in (get() for get in self._core_temp_getters) if v]
+                if values:
+                    temp = sum(values) / len(values)
+
+            if not temp:
+                temp = next((v for v in (get() for get in self._fallback_temp_getters) if v), None)
+
         except Exception as e:
-            servicemanager.LogErrorMsg(f"Error reading CPU temperature: {e}")
-            import traceback
-            servicemanager.LogErrorMsg(f"Temperature error traceback: {traceback.format_exc()}")
-            temp = None
+            self.log_state("CPU temperature", f"Error reading CPU temperature: {e}")
+            return 0
 
         # Return the best temperature we found as integer
         if temp is not None and temp > 0:
-            servicemanager.LogInfoMsg(f"Returning real temperature: {int(round(temp))}°C")
+            self.log_state("CPU temperature")
+            if self._debug:
+                servicemanager.LogInfoMsg(f"CPU temperature: {temp}°C")
             return int(round(temp))
-        else:
-            servicemanager.LogErrorMsg("Failed to get real CPU temperature - returning 0")
-            return 0  # Return 0 to indicate failure, not fake data
+
+        self.log_state("CPU temperature", "Failed to get real CPU temperature - returning 0")
+        return 0  # Return 0 to indicate failure, not fake data
 
     def get_cpu_load(self):
-        """Return CPU usage percentage using standard psutil"""
+        """Return CPU usage percentage"""
         return self.cpu_monitor.get_cpu_usage()
 
+    def init_audio(self):
+        """Activate the default speakers' endpoint volume and subscribe to its changes"""
+        # Watch for device changes first, so one happening while the endpoint
+        # is being activated still marks it stale
+        self._audio_stale = False
+        enumerator = AudioUtilities.GetDeviceEnumerator()
+        endpoint_callback = EndpointChangeCallback(self.on_endpoint_changed)
+        enumerator.RegisterEndpointNotificationCallback(endpoint_callback)
+        self._device_enumerator = enumerator
+        self._endpoint_callback = endpoint_callback
+        
+        devices = enumerator.GetDefaultAudioEndpoint(EDataFlow.eRender.value, ERole.eMultimedia.value)
+        interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+        volume = cast(interface, POINTER(IAudioEndpointVolume))
+        self.on_volume_changed(volume.GetMasterVolumeLevelScalar())
+        
+        callback = VolumeChangeCallback(self.on_volume_changed)
+        volume.RegisterControlChangeNotify(callback)
+        self._volume_callback = callback
+        self._volume_iface = volume
+
+    def on_volume_changed(self, level):
+        """Store the master volume pushed by VolumeChangeCallback"""
+        self._cached_volume = int(round(level * 100))
+
+    def on_endpoint_changed(self):
+        """Mark the endpoint volume stale after a default device or device state change"""
+        self._audio_stale = True
+
+    def cleanup_audio(self):
+        """Unsubscribe from volume and device changes and release the endpoint volume"""
+        if self._volume_iface is not None:
+            try:
+                self._volume_iface.UnregisterControlChangeNotify(self._volume_callback)
+            except Exception as e:
+                servicemanager.LogErrorMsg(f"Error unregistering volume callback: {e}")
+        if self._device_enumerator is not None:
+            try:
+                self._device_enumerator.UnregisterEndpointNotificationCallback(self._endpoint_callback)
+            except Exception as e:
+                servicemanager.LogErrorMsg(f"Error unregistering device callback: {e}")
+        # Dropping the last references releases the COM objects here, while
+        # COM is still initialized, rather than at interpreter shutdown
+        self._volume_iface = None
+        self._volume_callback = None
+        self._device_enumerator = None
+        self._endpoint_callback = None
+
     def get_master_volume(self):
-        """Get master volume level"""
-        try:
-            devices = AudioUtilities.GetSpeakers()
-            interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-            volume = cast(interface, POINTER(IAudioEndpointVolume))
-            return int(volume.GetMasterVolumeLevelScalar() * 100)
-        except Exception as e:
-            servicemanager.LogErrorMsg(f"Error reading volume: {e}")
-            return 0
+        """Get master volume level, as last reported by the volume callback"""
+        if self._audio_stale:
+            # The default output changed or went away; follow the new one
+            self.cleanup_audio()
+        if self._volume_iface is None:
+            try:
+                self.init_audio()
+                self.log_state("Volume")
+            except Exception as e:
+                # No speakers yet; try again on the next call
+                self.cleanup_audio()
+                self.log_state("Volume", f"Error reading volume: {e}")
+                return 0
+        return self._cached_volume
 
     def collect_hardware_data(self):
-        """Collect all hardware data with consistent format"""
-        # Use consistent time format (HH:MM) instead of timestamp
-        current_time = datetime.now().strftime("%H:%M")
-        
-        return {
-            "time": current_time,  # Use 'time' format consistently
-            "cpu_load": self.get_cpu_load(),
-            "volume": self.get_master_volume(),
-            "cpu_temp": self.get_cpu_temperature()
-        }
-
-    def data_collection_thread(self):
-        """Thread that continuously collects hardware data"""
-        servicemanager.LogInfoMsg("Data collection thread started")
-        
-        # Prime psutil CPU counter
-        psutil.cpu_percent(interval=None)
+        """Collect the values of one pipe frame: (cpu_load, volume, cpu_temp)"""
+        return (
+            self.get_cpu_load(),
+            self.get_master_volume(),
+            self.get_cpu_temperature(),
+        )
+
+    def current_sample(self):
+        """Return a sample no older than SAMPLE_MAX_AGE, collecting one if needed.
+
+        Samples are published by replacing the _last_sample tuple, which readers
+        pick up without locking. Sensor access is not thread-safe, so only the
+        collection itself is serialized.
+        """
+        taken, data = self._last_sample
+        if time.monotonic() - taken < self.SAMPLE_MAX_AGE:
+            return data
         
-        while not self.stop_event.is_set():
-            try:
+        with self.collect_lock:
+            # Another client may have collected while we waited for the lock
+            taken, data = self._last_sample
+            if time.monotonic() - taken >= self.SAMPLE_MAX_AGE:
                 data = self.collect_hardware_data()
-                with self.data_lock:
-                    self.current_data = data
-                    
-            except Exception as e:
-                servicemanager.LogErrorMsg(f"Error in data collection: {e}")
-                
-            # Wait 1 second or until stop event
-            self.stop_event.wait(1.0)
-            
-        servicemanager.LogInfoMsg("Data collection thread stopped")
+                self._last_sample = (time.monotonic(), data)
+        return data
+
+    def complete_io(self, pipe, overlapped, hr):
+        """Wait for an overlapped pipe operation; returns False if the service is stopping"""
+        if hr != winerror.ERROR_IO_PENDING:
+            return True
+
+        rc = win32event.WaitForMultipleObjects(
+            [overlapped.hEvent, self.hWaitStop], False, win32event.INFINITE
+        )
+        if rc != win32event.WAIT_OBJECT_0:
+            # Stop requested - cancel and wait until the cancellation completes
+            win32file.CancelIo(pipe)
+            try:
+                win32file.GetOverlappedResult(pipe, overlapped, True)
+            except pywintypes.error:
+                pass
+            return False
+
+        # Raises pywintypes.error if the operation failed
+        win32file.GetOverlappedResult(pipe, overlapped, False)
+        return True
 
     def named_pipe_server_thread(self):
-        """Thread that serves data via named pipe"""
+        """Thread that accepts named pipe clients and starts a writer thread for each"""
         servicemanager.LogInfoMsg("Named pipe server thread started")
         
+        # Overlapped I/O so a stop request can interrupt waits for a client
+        overlapped = pywintypes.OVERLAPPED()
+        overlapped.hEvent = win32event.CreateEvent(None, True, False, None)
+        client_threads = []
+        
         while not self.stop_event.is_set():
             try:
                 # Create named pipe
                 pipe = win32pipe.CreateNamedPipe(
                     self.pipe_name,
-                    win32pipe.PIPE_ACCESS_OUTBOUND,
+                    win32pipe.PIPE_ACCESS_OUTBOUND | win32file.FILE_FLAG_OVERLAPPED,
                     win32pipe.PIPE_TYPE_MESSAGE | win32pipe.PIPE_WAIT,
-                    1,  # Max instances
+                    win32pipe.PIPE_UNLIMITED_INSTANCES,  # Max instances
                     65536,  # Out buffer size
-                    65536,  # In buffer size
+                    0,  # In buffer size - outbound only, nothing is read
                     0,  # Default timeout
                     None  # Security attributes
                 )
                 
                 if pipe == win32file.INVALID_HANDLE_VALUE:
                     servicemanager.LogErrorMsg("Failed to create named pipe")
-                    time.sleep(5)
+                    if self.stop_event.wait(5):
+                        break
                     continue
                 
-                servicemanager.LogInfoMsg("Named pipe created, waiting for client connection")
+                try:
+                    servicemanager.LogInfoMsg("Named pipe created, waiting for client connection")
+                    
+                    # Wait for client connection
+                    connected = self.complete_io(pipe, overlapped, win32pipe.ConnectNamedPipe(pipe, overlapped))
+                except BaseException:
+                    win32file.CloseHandle(pipe)
+                    raise
                 
-                # Wait for client connection
-                win32pipe.ConnectNamedPipe(pipe, None)
-                servicemanager.LogInfoMsg("Client connected to named pipe")
+                if not connected:
+                    win32file.CloseHandle(pipe)
+                    break
                 
-                # Serve data to connected client
-                while not self.stop_event.is_set():
-                    try:
-                        with self.data_lock:
-                            data = self.current_data.copy()
-                        
-                        if data:
-                            json_data = json.dumps(data) + '\n'
-                            win32file.WriteFile(pipe, json_data.encode('utf-8'))
-                        
-                        # Send data every second
-                        if self.stop_event.wait(1.0):
-                            break
-                            
-                    except pywintypes.error as e:
-                        if e.winerror == 232:  # Broken pipe - client disconnected
-                            servicemanager.LogInfoMsg("Client disconnected from named pipe")
-                            break
-                        else:
-                            servicemanager.LogErrorMsg(f"Named pipe error: {e}")
-                            break
-                    except Exception as e:
-                        servicemanager.LogErrorMsg(f"Error serving data: {e}")
-                        break
+                servicemanager.LogInfoMsg("Client connected to named pipe")
                 
-                # Close pipe
-                win32file.CloseHandle(pipe)
+                # Serve this client on its own thread; the loop immediately
+                # creates the next pipe instance for further clients
+                client_threads = [t for t in client_threads if t.is_alive()]
+                thread = threading.Thread(target=self.serve_client, args=(pipe,), daemon=True)
+                thread.start()
+                client_threads.append(thread)
                 
             except Exception as e:
                 servicemanager.LogErrorMsg(f"Named pipe server error: {e}")
-                time.sleep(5)
-                
+                # Retry after a pause, but don't hold up a service stop
+                if self.stop_event.wait(5):
+                    break
+        
+        # Client writes are cancelled by the stop event, so this is normally
+        # immediate; the shared deadline bounds the total wait either way
+        deadline = time.monotonic() + 5
+        for thread in client_threads:
+            thread.join(timeout=max(0, deadline - time.monotonic()))
+        win32file.CloseHandle(overlapped.hEvent)
         servicemanager.LogInfoMsg("Named pipe server thread stopped")
 
+    def serve_client(self, pipe):
+        """Write fresh data to a connected client every second until it disconnects"""
+        overlapped = pywintypes.OVERLAPPED()
+        overlapped.hEvent = win32event.CreateEvent(None, True, False, None)
+        com_initialized = False
+        
+        # Most readings repeat from one second to the next, so the frame
+        # is only packed again when the data actually changes
+        pack = PIPE_FRAME.pack
+        last_data = None
+        payload = None
+        
+        try:
+            # Data collection reads the volume through COM
+            com_initialized = init_com_thread()
+            
+            while not self.stop_event.is_set():
+                try:
+                    # Gather fresh data right before each write
+                    try:
+                        data = self.current_sample()
+                        self.log_state("Data collection")
+                        if self._debug:
+                            servicemanager.LogInfoMsg(f"Collected data: {data}")
+                    except Exception as e:
+                        self.log_state("Data collection", f"Error in data collection: {e}")
+                        data = None
+                    
+                    if data:
+                        if data != last_data:
+                            payload = pack(PIPE_FRAME_VERSION, *data)
+                            last_data = data
+                        hr, _ = win32file.WriteFile(pipe, payload, overlapped)
+                        if not self.complete_io(pipe, overlapped, hr):
+                            break
+                    
+                    # Send data every second
+                    if self.stop_event.wait(1.0):
+                        break
+                        
+                except pywintypes.error as e:
+                    if e.winerror in (winerror.ERROR_NO_DATA, winerror.ERROR_BROKEN_PIPE):  # Client disconnected
+                        servicemanager.LogInfoMsg("Client disconnected from named pipe")
+                    else:
+                        servicemanager.LogErrorMsg(f"Named pipe error: {e}")
+                    break
+                except Exception as e:
+                    servicemanager.LogErrorMsg(f"Error serving data: {e}")
+                    break
+        finally:
+            # Close pipe
+            win32file.CloseHandle(pipe)
+            win32file.CloseHandle(overlapped.hEvent)
+            if com_initialized:
+                pythoncom.CoUninitialize()
+
     def SvcStop(self):
         """Stop the service"""
         servicemanager.LogInfoMsg("Service stop requested")
@@ -453,6 +766,10 @@ class HardwareMonitorService(win32serviceutil.ServiceFramework):
             (self._svc_name_, '')
         )
         
+        # Keep the multithreaded apartment alive for the whole service run, so
+        # the cached audio interface survives client threads coming and going
+        com_initialized = init_com_thread()
+        
         try:
             # Initialize LibreHardwareMonitor after service framework is fully started
             servicemanager.LogInfoMsg("=== INITIALIZING HARDWARE MONITOR SERVICE ===")
@@ -469,27 +786,17 @@ class HardwareMonitorService(win32serviceutil.ServiceFramework):
                 servicemanager.LogInfoMsg("Could not check administrator status")
             
             # Initialize LibreHardwareMonitor now that service framework is ready
-            servicemanager.LogInfoMsg("Initializing LibreHardwareMonitor...")
             self.init_hardware_monitor()
             
             if not self.computer:
                 servicemanager.LogErrorMsg("LibreHardwareMonitor initialization failed - service cannot continue")
                 return
             
-            servicemanager.LogInfoMsg("LibreHardwareMonitor initialized successfully")
-            
-            # Initialize psutil CPU monitoring
-            servicemanager.LogInfoMsg("Initializing psutil CPU monitoring...")
+            # Initialize CPU monitoring
             if not self.cpu_monitor.initialize():
-                servicemanager.LogErrorMsg("psutil CPU monitoring initialization failed - will use basic fallback")
-            else:
-                servicemanager.LogInfoMsg("psutil CPU monitoring initialized successfully")
-            
-            # Start data collection thread
-            data_thread = threading.Thread(target=self.data_collection_thread, daemon=True)
-            data_thread.start()
+                servicemanager.LogErrorMsg("CPU monitoring initialization failed - will use basic fallback")
             
-            # Start named pipe server thread
+            # Start named pipe server thread (collects data on demand)
             pipe_thread = threading.Thread(target=self.named_pipe_server_thread, daemon=True)
             pipe_thread.start()
             
@@ -501,12 +808,12 @@ class HardwareMonitorService(win32serviceutil.ServiceFramework):
             
             # Wait for threads to finish
             servicemanager.LogInfoMsg("Waiting for threads to finish...")
-            data_thread.join(timeout=5)
             pipe_thread.join(timeout=5)
             
             # Clean up resources
             servicemanager.LogInfoMsg("Cleaning up resources...")
             self.cpu_monitor.cleanup()
+            self.cleanup_audio()
             
             if self.computer:
                 try:
@@ -523,10 +830,14 @@ class HardwareMonitorService(win32serviceutil.ServiceFramework):
             # Clean up resources even on error
             try:
                 self.cpu_monitor.cleanup()
+                self.cleanup_audio()
                 if self.computer:
                     self.computer.Close()
             except:
                 pass
+        finally:
+            if com_initialized:
+                pythoncom.CoUninitialize()
         
         servicemanager.LogMsg(
             servicemanager.EVENTLOG_INFORMATION_TYPE,
@@ -4,18 +4,23 @@ This client runs in user space and connects to the hardware monitoring service.
 It handles the system tray interface and serial communication.
 """
 
-import json
+import base64
+import io
+import random
+import struct
 import threading
 import time
 import sys
 import os
 from datetime import datetime
+import win32event
 import win32pipe
 import win32file
 import pywintypes
+import winerror
 
 import serial
-from PIL import Image, ImageDraw
+from PIL import Image
 import pystray
 
 # Import our ESP32 port detector
@@ -24,18 +29,41 @@ from esp32_port_detector import ESP32PortDetector
 # ===== CONFIGURATION =====
 # No config file needed - using hardcoded defaults
 BAUD_RATE = 115200
+DEBUG = False  # Print every pipe frame and port scan
+PORT_CIRCUIT_THRESHOLD = 3  # Consecutive open failures before reporting the port as tripped
+PORT_RETRY_MAX = 300.0      # Longest wait between open attempts on a failing port (seconds)
+
+# Pipe message from the service: version, CPU load (%), master volume (%),
+# CPU temperature (°C). Keep in sync with hardware_monitor_service.py
+PIPE_FRAME = struct.Struct("<BBBH")
+PIPE_FRAME_VERSION = 1
+
+# JSON line sent to the ESP32; same layout as collect_data() returns
+_TX_FMT = b'{"time":"%s","cpu_load":%d,"volume":%d,"cpu_temp":%d}\n'
 
 
 class HardwareDataClient:
     """Client that connects to the hardware monitoring service via named pipe"""
 
+    # Reconnect delays double from MIN to MAX seconds while the service is unreachable
+    RECONNECT_DELAY_MIN = 0.25
+    RECONNECT_DELAY_MAX = 30.0
+
     def __init__(self):
         self.pipe_name = r'\\.\pipe\TrayHardwareMonitor'
         self.pipe = None
         self.connected = False
+        self._backoff = self.RECONNECT_DELAY_MIN
+        # Replaced with a new dict for every frame and never mutated, so
+        # readers can use it without locking or copying
         self.last_data = {}
-        self.data_lock = threading.Lock()
         self.stop_event = threading.Event()
+        # Win32 mirror of stop_event, so pipe reads can wait on it
+        self._stop_handle = win32event.CreateEvent(None, True, False, None)
+        # Set whenever `connected` changes; starts set so the tooltip shows the initial state
+        self._status_changed = threading.Event()
+        self._status_changed.set()
+        self.connected_event = threading.Event()  # Set while connected to the service
 
     def connect_to_service(self):
         """Connect to the hardware monitoring service"""
@@ -47,12 +75,15 @@ class HardwareDataClient:
                 0,
                 None,
                 win32file.OPEN_EXISTING,
-                0,
+                win32file.FILE_FLAG_OVERLAPPED,
                 None
             )
 
             if self.pipe != win32file.INVALID_HANDLE_VALUE:
                 self.connected = True
+                self.connected_event.set()
+                self._status_changed.set()
+                self._backoff = self.RECONNECT_DELAY_MIN
                 print("Connected to hardware monitoring service")
                 return True
             else:
@@ -69,11 +100,56 @@ class HardwareDataClient:
             win32file.CloseHandle(self.pipe)
             self.pipe = None
         self.connected = False
+        self.connected_event.clear()
+        self._status_changed.set()
         print("Disconnected from hardware monitoring service")
 
+    def read_into(self, overlapped, buffer):
+        """Read up to len(buffer) bytes from the pipe.
+
+        Returns the number of bytes read, or None if the client is stopping.
+        """
+        hr, _ = win32file.ReadFile(self.pipe, buffer, overlapped)
+        if hr == winerror.ERROR_IO_PENDING:
+            rc = win32event.WaitForMultipleObjects(
+                [overlapped.hEvent, self._stop_handle], False, win32event.INFINITE
+            )
+            if rc != win32event.WAIT_OBJECT_0:
+                # Stopping: cancel the read and wait until the kernel
+                # is done with the buffer
+                win32file.CancelIo(self.pipe)
+                try:
+                    win32file.GetOverlappedResult(self.pipe, overlapped, True)
+                except pywintypes.error:
+                    pass
+                return None
+        return win32file.GetOverlappedResult(self.pipe, overlapped, True)
+
+    def read_frame(self, overlapped, buffer):
+        """Fill buffer with exactly one frame.
+
+        Frames have a fixed size, so byte-mode reads of that length keep them
+        aligned; a short read (rare, the service writes each frame whole) is
+        topped up from the next read. Returns False if the client is stopping.
+        """
+        size = self.read_into(overlapped, buffer)
+        while size is not None and size < PIPE_FRAME.size:
+            rest = win32file.AllocateReadBuffer(PIPE_FRAME.size - size)
+            got = self.read_into(overlapped, rest)
+            if got is None:
+                return False
+            buffer[size:size + got] = rest[:got]
+            size += got
+        return size is not None
+
     def read_data_thread(self):
         """Thread that continuously reads data from the service"""
         print("Hardware data reader thread started")
+        
+        # Overlapped reads so stop() can interrupt a read that is waiting for data
+        overlapped = pywintypes.OVERLAPPED()
+        overlapped.hEvent = win32event.CreateEvent(None, True, False, None)
+        buffer = win32file.AllocateReadBuffer(PIPE_FRAME.size)
 
         while not self.stop_event.is_set():
             if not self.connected:
@@ -81,22 +157,31 @@ class HardwareDataClient:
                 if self.connect_to_service():
                     continue
                 else:
-                    # Wait before retrying
-                    if self.stop_event.wait(5.0):
+                    # Wait before retrying, backing off exponentially with
+                    # jitter so several clients don't retry in lockstep
+                    delay = self._backoff * random.uniform(0.9, 1.1)
+                    self._backoff = min(self.RECONNECT_DELAY_MAX, self._backoff * 2)
+                    if self.stop_event.wait(delay):
                         break
                     continue
 
             try:
-                # Read data from pipe
-                result, data = win32file.ReadFile(self.pipe, 4096)
-                if result == 0 and data:
-                    # Parse JSON data
-                    json_str = data.decode('utf-8').strip()
-                    if json_str:
-                        print(json_str)
-                        hardware_data = json.loads(json_str)
-                        with self.data_lock:
-                            self.last_data = hardware_data
+                # Read one frame from pipe
+                if not self.read_frame(overlapped, buffer):
+                    break
+                # Decode straight from the read buffer, no intermediate bytes
+                version, cpu_load, volume, cpu_temp = PIPE_FRAME.unpack_from(buffer)
+                if version == PIPE_FRAME_VERSION:
+                    hardware_data = {
+                        "cpu_load": cpu_load,
+                        "volume": volume,
+                        "cpu_temp": cpu_temp
+                    }
+                    if DEBUG:
+                        print(hardware_data)
+                    self.last_data = hardware_data
+                else:
+                    print(f"Unsupported data frame version {version}")
 
             except pywintypes.error as e:
                 if e.winerror == 109:  # Broken pipe
@@ -105,19 +190,17 @@ class HardwareDataClient:
                 else:
                     print(f"Pipe read error: {e}")
                     self.disconnect_from_service()
-            except json.JSONDecodeError as e:
-                print(f"JSON decode error: {e}")
             except Exception as e:
                 print(f"Unexpected error reading from service: {e}")
                 self.disconnect_from_service()
 
         self.disconnect_from_service()
+        win32file.CloseHandle(overlapped.hEvent)
         print("Hardware data reader thread stopped")
 
     def get_hardware_data(self):
-        """Get the latest hardware data from the service"""
-        with self.data_lock:
-            return self.last_data.copy()
+        """Get the latest hardware data from the service (treat as read-only)"""
+        return self.last_data
 
     def start(self):
         """Start the data reading thread"""
@@ -127,7 +210,9 @@ class HardwareDataClient:
     def stop(self):
         """Stop the data reading thread"""
         self.stop_event.set()
-        self.disconnect_from_service()
+        win32event.SetEvent(self._stop_handle)
+        # The reader cancels any pending read and disconnects on its way out
+        self.reader_thread.join(timeout=5)
 
 
 def get_time_str():
@@ -152,26 +237,44 @@ def serial_worker(stop_event, hardware_client):
     ser = None
     current_port = None
     last_port_scan = 0
-    port_scan_interval = 10  # Scan for new ports every 10 seconds
+    last_values = None
     
     def cleanup_serial():
         nonlocal ser
         if ser and ser.is_open:
             try:
                 ser.close()
-                print(f"Closed serial connection on {current_port}")
+                if DEBUG:
+                    print(f"Closed serial connection on {current_port}")
             except:
                 pass
         ser = None
     
+    # Per-port circuit breaker: after a failed open the port is left alone for
+    # an exponentially growing, jittered delay (capped at PORT_RETRY_MAX)
+    port_failures = {}
+    port_next_retry = {}
+    
     def try_connect_to_port(port):
         """Try to connect to a specific port"""
+        if time.monotonic() < port_next_retry.get(port, 0):
+            return None
         try:
-            test_ser = serial.Serial(port, BAUD_RATE, timeout=1)
+            # Bound writes too, so a bridge that stops draining (ESP32 reset)
+            # cannot stall the loop
+            test_ser = serial.Serial(port, BAUD_RATE, timeout=1, write_timeout=0.5)
             print(f"Serial connection opened on {port} at {BAUD_RATE} baud.")
+            port_failures.pop(port, None)
+            port_next_retry.pop(port, None)
             return test_ser
         except serial.SerialException as e:
+            failures = port_failures.get(port, 0) + 1
+            port_failures[port] = failures
+            delay = min(PORT_RETRY_MAX, 2 ** failures) * random.uniform(0.9, 1.1)
+            port_next_retry[port] = time.monotonic() + delay
             print(f"Failed to connect to {port}: {e}")
+            if failures >= PORT_CIRCUIT_THRESHOLD:
+                print(f"Circuit open for {port} after {failures} failures, next attempt in {delay:.0f}s")
             return None
     
     print("Starting enhanced serial worker with ESP32 auto-detection...")
@@ -179,17 +282,26 @@ def serial_worker(stop_event, hardware_client):
     while not stop_event.is_set():
         current_time = time.time()
         
-        # Check if we need to scan for ports (either no connection or periodic scan)
-        if (ser is None or not ser.is_open or 
-            current_time - last_port_scan > port_scan_interval):
+        # Only reconnect while there is no working connection; a write
+        # failure closes the port. The last working port is reopened first,
+        # since the board usually comes back on it and enumerating is slower.
+        if (ser is None or not ser.is_open) and current_port:
+            ser = try_connect_to_port(current_port)
+            if ser is None:
+                current_port = None
+        
+        # Scan for ports only if that did not work
+        if ser is None or not ser.is_open:
             
-            print("Scanning for ESP32 devices...")
+            if DEBUG:
+                print("Scanning for ESP32 devices...")
             
             # Try auto-detection
             detected_port = detector.get_best_esp32_port(test_connection=False)
             
             if detected_port:
-                print(f"Auto-detected ESP32 on {detected_port}")
+                if DEBUG:
+                    print(f"Auto-detected ESP32 on {detected_port}")
                 
                 # If this is a new port, try to connect
                 if detected_port != current_port:
@@ -198,7 +310,8 @@ def serial_worker(stop_event, hardware_client):
                     if ser:
                         current_port = detected_port
             else:
-                print("No ESP32 devices found")
+                if DEBUG:
+                    print("No ESP32 devices found")
                 cleanup_serial()
                 current_port = None
             
@@ -206,63 +319,66 @@ def serial_worker(stop_event, hardware_client):
         
         # Try to send data if we have a connection
         if ser and ser.is_open:
-            payload = collect_data(hardware_client)
+            hardware_data = hardware_client.get_hardware_data()
+            values = (
+                get_time_str(),
+                hardware_data.get("cpu_load", 0),
+                hardware_data.get("volume", 0),
+                hardware_data.get("cpu_temp", 0)
+            )
+            # The line only changes when a value or the minute does; reuse the
+            # last encoded one otherwise
+            if values != last_values:
+                payload = _TX_FMT % (values[0].encode(), *values[1:])
+                last_values = values
             try:
-                ser.write(json.dumps(payload).encode() + b"\n")
+                ser.write(payload)
+            except serial.SerialTimeoutException:
+                print(f"Serial write timed out on {current_port}, rescanning...")
+                # A port that stopped draining is likely resetting or
+                # re-enumerating, so look it up again instead of reopening it
+                cleanup_serial()
+                current_port = None
+                last_port_scan = 0
             except serial.SerialException as e:
                 print(f"Serial communication error on {current_port}: {e}")
                 print("Will attempt to reconnect...")
+                # Keep current_port so the next iteration retries it before rescanning
                 cleanup_serial()
-                current_port = None
             except Exception as e:
                 print(f"Unexpected error sending data: {e}")
         else:
             # No connection available, wait a bit before trying again
-            if current_time - last_port_scan > 5:  # Only print this message occasionally
+            if DEBUG and current_time - last_port_scan > 5:  # Only print this message occasionally
                 print("No ESP32 connection available, scanning...")
         
         # Wait before next iteration
-        time.sleep(1)
+        if stop_event.wait(1.0):
+            break
     
     # Cleanup on exit
     cleanup_serial()
     print("Serial worker thread stopped")
 
 # ===== Tray icon =====
+# 64x64 RGBA tray icon, pre-rendered to PNG: a dark blue CPU chip with grey
+# pins on all four sides, green signal arcs (serial communication) and a red
+# temperature dot
+_ICON_PNG_B64 = (
+    b"iVBORw0KGgoAAAANSUhEUgAAAEAAAABACAYAAACqaXHeAAABmUlEQVR42u1byxGCMBBdHOrQK0VQ"
+    b"AgdK8GARlGARHizBAyVQhFdpRA+OQwiEfAiSbN7OeJCNDPvc9/YRNCNNtG37Ft9XVZVxyh8o8QAA"
+    b"qQOQywfKy5gzHPPdbdCBzPYEHEIEIFct6p8du8KPRQkNmGiAPCeJiK4PvgU3NRHVQ80YgwAg8VCO"
+    b"wRimwIuGazxRaTwFjMZgLIXLx0yAAAViBmDu27fJW/uA/n4dOHRujE/s+jn4AFBgOXQi510ExfYV"
+    b"2zrG9nf2AarC54qT1/7WbAGKDx9gRAHTC1YVvyUdfi/nu0Hje+lzMylwiRKht76TCJoWJa8LWROs"
+    b"9wPmOsFGE/YGxYsPCFUTNtUArpqwyghx0AQv+wE+fMI/wtkHuHRCaMV71wCdJuhscyia4PVmyFUT"
+    b"dtUAlQ9Yuyc41wF7F34syq8P2IICSVhhbIgwjKifCwTjA0ABABBv4PcBoAAAgA+ADwAFAAB8AHwA"
+    b"KAAA4APgA0ABAAAfAB8ACqRGAd3ISNYHjDizoA8x5hf/LyAmicaCwTEPEUwdgA9W6yH/T8Z3LQAA"
+    b"AABJRU5ErkJggg=="
+)
+
 def create_image():
     """Create a tray icon representing hardware monitoring and serial communication"""
-    img = Image.new('RGBA', (64, 64), color=(0, 0, 0, 0))  # Transparent background
-    d = ImageDraw.Draw(img)
-    
-    # Draw a computer/CPU chip representation - using more of the available space
-    # Main chip body (dark blue) - expanded to use more of the canvas
-    d.rectangle((4, 4, 60, 60), fill=(30, 60, 120), outline=(60, 100, 180), width=2)
-    
-    # CPU pins/connections (silver/gray) - extended to edges
-    # Top pins
-    for x in range(8, 57, 8):
-        d.rectangle((x, 0, x+3, 4), fill=(180, 180, 180))
-    # Bottom pins  
-    for x in range(8, 57, 8):
-        d.rectangle((x, 60, x+3, 64), fill=(180, 180, 180))
-    # Left pins
-    for y in range(8, 57, 8):
-        d.rectangle((0, y, 4, y+3), fill=(180, 180, 180))
-    # Right pins
-    for y in range(8, 57, 8):
-        d.rectangle((60, y, 64, y+3), fill=(180, 180, 180))
-    
-    # Draw signal waves (representing serial communication) - larger and more prominent
-    # Green signal lines
-    signal_color = (0, 220, 0)
-    d.arc((8, 8, 24, 24), 0, 180, fill=signal_color, width=3)
-    d.arc((12, 12, 28, 28), 0, 180, fill=signal_color, width=3)
-    d.arc((16, 16, 32, 32), 0, 180, fill=signal_color, width=3)
-    
-    # Add a temperature indicator (red dot) - larger and more visible
-    d.ellipse((44, 12, 52, 20), fill=(255, 60, 60))
-    
-    return img
+    return Image.open(io.BytesIO(base64.b64decode(_ICON_PNG_B64)))
 
 def create_menu(hardware_client):
     """Create tray menu"""
@@ -284,11 +400,14 @@ def update_tooltip(icon, hardware_client):
     icon.title = tooltip
 
 def tooltip_updater(icon, hardware_client, stop_event):
-    """Thread to periodically update the tooltip"""
+    """Thread to update the tooltip whenever the connection status changes"""
     while not stop_event.is_set():
-        update_tooltip(icon, hardware_client)
-        if stop_event.wait(2.0):  # Update every 2 seconds
+        # Shutdown disconnects the client, which also wakes this wait
+        hardware_client._status_changed.wait()
+        hardware_client._status_changed.clear()
+        if stop_event.is_set():
             break
+        update_tooltip(icon, hardware_client)
 
 if __name__ == "__main__":
     print("Starting Tray Serial Monitor Client...")
@@ -298,7 +417,7 @@ if __name__ == "__main__":
     hardware_client.start()
 
     # Give the client a moment to connect
-    time.sleep(2)
+    hardware_client.connected_event.wait(timeout=2.0)
 
     # Test data collection
     print("Testing data collection...")
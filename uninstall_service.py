@@ -6,75 +6,73 @@ Designed for use with automated installers.
 
 import os
 import sys
-import subprocess
+import ctypes
+
+# Bound once at import; None when shell32 is unavailable
+try:
+    _IsUserAnAdmin = ctypes.windll.shell32.IsUserAnAdmin
+    _IsUserAnAdmin.argtypes = []
+    _IsUserAnAdmin.restype = ctypes.c_int
+except (AttributeError, OSError):
+    _IsUserAnAdmin = None
+
+# When running as a PyInstaller executable, __file__ points to the temp
+# directory; the service exe is next to the uninstaller executable instead
+if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
+    INSTALL_DIR = os.path.dirname(sys.executable)
+else:
+    INSTALL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# For standalone executable, look for the service exe file
+SERVICE_EXE = os.path.join(INSTALL_DIR, "TrayHardwareMonitorService.exe")
 
 def is_admin():
     """Check if running as administrator"""
     try:
-        import ctypes
-        return ctypes.windll.shell32.IsUserAnAdmin()
-    except:
+        return bool(_IsUserAnAdmin())
+    except Exception:
         return False
 
 def uninstall_service():
     """Uninstall the hardware monitoring service"""
     print("Uninstalling Hardware Monitor Service...")
     
-    # When running as a PyInstaller executable, __file__ points to the temp directory
-    # We need to find the actual installation directory where the service exe is located
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Check if we're running from a PyInstaller temp directory
-    if "_MEI" in current_dir:
-        # We're running from PyInstaller temp directory, need to find the real installation directory
-        # Try to get the directory where the uninstaller executable is located
-        import sys
-        if hasattr(sys, '_MEIPASS'):
-            # Get the directory containing the uninstaller executable
-            uninstaller_dir = os.path.dirname(sys.executable)
-            print(f"Detected PyInstaller environment. Looking in uninstaller directory: {uninstaller_dir}")
-            current_dir = uninstaller_dir
-    
-    # For standalone executable, look for the service exe file
-    service_exe = os.path.join(current_dir, "TrayHardwareMonitorService.exe")
-    
-    if not os.path.exists(service_exe):
-        print(f"WARNING: Service executable not found at {service_exe}")
-        print(f"Current directory: {current_dir}")
+    if not os.path.exists(SERVICE_EXE):
+        print(f"WARNING: Service executable not found at {SERVICE_EXE}")
+        print(f"Current directory: {INSTALL_DIR}")
         print("Available files:")
         try:
-            for file in os.listdir(current_dir):
+            for file in os.listdir(INSTALL_DIR):
                 print(f"  - {file}")
         except:
             pass
         return True  # Consider it already uninstalled
     
     try:
+        import win32service
+        import win32serviceutil
+        
         # Stop the service first
         print("Stopping service...")
-        cmd = [service_exe, "stop"]
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=current_dir, timeout=30)
-        
-        if result.returncode == 0:
+        try:
+            win32serviceutil.StopService("TrayHardwareMonitor")
+            # Wait until the executable has exited so its files can be removed
+            win32serviceutil.WaitForServiceStatus("TrayHardwareMonitor", win32service.SERVICE_STOPPED, 30)
             print("✓ Service stopped successfully")
-        else:
-            print(f"⚠ Service stop result: {result.stderr}")
+        except Exception as e:
+            print(f"⚠ Service stop result: {e}")
         
         # Uninstall the service
         print("Removing service...")
-        cmd = [service_exe, "remove"]
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=current_dir, timeout=30)
-        
-        if result.returncode == 0:
-            print("✓ Service removed successfully")
-            return True
-        else:
-            print(f"✗ Failed to remove service: {result.stderr}")
+        try:
+            win32serviceutil.RemoveService("TrayHardwareMonitor")
+        except Exception as e:
+            print(f"✗ Failed to remove service: {e}")
             return False
+        
+        print("✓ Service removed successfully")
+        return True
             
-    except subprocess.TimeoutExpired:
-        print("✗ Service uninstallation timed out")
-        return False
     except Exception as e:
         print(f"✗ Error uninstalling service: {e}")
         return False